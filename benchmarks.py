@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmarks for the ingestion pipeline. Run with: python benchmarks.py
+
+import os, csv, json, time, tempfile, tracemalloc
+from kg_nal import CSVGraphAdapter, ParseData, record_to_dict
+
+csv_file_path = 'data/Microbiomics_BGC_dataset_test.csv'
+schema_json_path = 'schema.json'
+
+
+def make_large_csv(source_csv_path, n_copies):
+    """
+    Writes a temporary CSV made of the header and n_copies repetitions of the source rows.
+
+    Args:
+        source_csv_path (str): The path to the source CSV file.
+        n_copies (int): The number of times the data rows are repeated.
+
+    Returns:
+        str: The path to the temporary CSV file.
+    """
+    with open(source_csv_path, 'rb') as file:
+        header = file.readline()
+        rows = file.read()
+    if not rows.endswith(b'\n'):
+        rows += b'\n'
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(header)
+        for _ in range(n_copies):
+            file.write(rows)
+    return path
+
+
+def benchmark_csv_adapter(n_copies=2000):
+    """
+    Times CSVGraphAdapter.adapt plus building every NodeRecord and RelationshipRecord, for 1 worker
+    up to one worker per CPU. Only the parsing in adapt runs in the process pool; the records are
+    built in the parent, so both times are reported. Reports the speedup against 1 worker, flags
+    worker counts that are slower, and checks the output is identical.
+    """
+    path = make_large_csv(csv_file_path, n_copies)
+    try:
+        print(f"CSV adapter on {os.path.getsize(path) / 1e6:.1f} MB")
+        reference = None
+        baseline = None
+        max_workers = os.cpu_count() or 1
+        worker_counts = sorted({n for n in (1, 2, 4, 8, 16, max_workers) if n <= max_workers})
+        if max_workers == 1:
+            print("  only 1 CPU available: the speedup cannot be measured here")
+        for n_workers in worker_counts:
+            adapter = CSVGraphAdapter(schema_json_path, n_workers=n_workers)
+            start = time.perf_counter()
+            result = adapter.adapt(path)
+            parsed = time.perf_counter() - start
+            nodes, relationships = list(result['nodes']), list(result['relationships'])
+            elapsed = time.perf_counter() - start
+            serialized = json.dumps({'nodes': nodes, 'relationships': relationships}, default=record_to_dict)
+            if reference is None:
+                reference, baseline = serialized, elapsed
+            assert serialized == reference, "Output differs between worker counts"
+            speedup = baseline / elapsed
+            flag = "  SLOWER THAN 1 WORKER" if speedup < 1 and n_workers > 1 else ""
+            print(f"  workers={n_workers:<3} {elapsed:.2f}s (parse {parsed:.2f}s, records {elapsed - parsed:.2f}s)"
+                  f"  {len(nodes) / elapsed:,.0f} nodes/s  speedup {speedup:.2f}x{flag}")
+    finally:
+        os.remove(path)
+
+
+def legacy_adapt_csv(csv_file_path, schema_json_path):
+    """
+    The dictionary-per-node adapter from the notebook, kept as the baseline for the memory benchmark.
+    """
+    with open(schema_json_path) as json_file:
+        schema = json.load(json_file)
+
+    nodes = []
+    relationships = []
+    label_to_properties = {node['labels'][0]: node['properties'] for node in schema['nodes']}
+    with open(csv_file_path, newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            for label, properties in label_to_properties.items():
+                node_properties = {prop: row[prop] for prop in properties if prop in row}
+                node_properties['name'] = row.get(label, "")
+                nodes.append({"id": f"n{len(nodes)}", "labels": [label], "properties": node_properties})
+            relationships.append({'from': row['Genome'], 'to': row['BGC'], 'type': 'CONTAINS'})
+            relationships.append({'from': row['BGC'], 'to': row['product'], 'type': 'PRODUCES'})
+            relationships.append({'from': row['Taxonomy'], 'to': row['BGC'], 'type': 'CONTAINS'})
+    return {'nodes': nodes, 'relationships': relationships}
+
+
+def peak_memory(function, *args):
+    """
+    Returns the peak traced memory in MB while calling function(*args).
+    """
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def benchmark_memory(n_copies=500):
+    """
+    Compares peak memory of dictionary nodes against the columnar adapter output, the same output
+    with every NodeRecord/RelationshipRecord built, and records loaded from a payload file.
+    """
+    csv_path = make_large_csv(csv_file_path, n_copies)
+    fd, json_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        adapter = CSVGraphAdapter(schema_json_path, n_workers=1)
+        with open(json_path, 'w') as file:
+            json.dump(adapter.adapt(csv_path), file, default=record_to_dict)
+
+        def load_json_dicts(path):
+            with open(path) as file:
+                return json.load(file)
+
+        def adapt_to_records(path):
+            result = adapter.adapt(path)
+            return list(result['nodes']), list(result['relationships'])
+
+        print(f"Peak memory on {n_copies * 50} CSV rows")
+        before = peak_memory(legacy_adapt_csv, csv_path, schema_json_path)
+        after = peak_memory(adapter.adapt, csv_path)
+        print(f"  adapt CSV:  dicts {before:.1f} MB  columnar {after:.1f} MB  ({before / after:.1f}x)")
+        after = peak_memory(adapt_to_records, csv_path)
+        print(f"  adapt CSV:  dicts {before:.1f} MB  all records built {after:.1f} MB  ({before / after:.1f}x)")
+        before = peak_memory(load_json_dicts, json_path)
+        after = peak_memory(ParseData.load_graph_json, json_path)
+        print(f"  load JSON:  dicts {before:.1f} MB  records {after:.1f} MB  ({before / after:.1f}x)")
+    finally:
+        os.remove(csv_path)
+        os.remove(json_path)
+
+
+if __name__ == '__main__':
+    benchmark_csv_adapter()
+    benchmark_memory()
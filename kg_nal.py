@@ -3,9 +3,23 @@
 
 # get_ipython().system('pip install neo4j')
 
-import json, csv, re
+import json, csv, re, os, sys, io, gzip, time, random, threading, queue
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from neo4j import GraphDatabase
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import Neo4jError, DriverError
 
 # Connection to Neo4j
 class Neo4jConnection:
@@ -16,16 +30,23 @@ class Neo4jConnection:
         uri (str): The URI of the Neo4j database.
         user (str): The username for authentication.
         pwd (str): The password for authentication.
+        max_retries (int, optional): The number of retries for transient and leader-switch errors. Defaults to 5.
+        retry_delay (float, optional): The initial retry delay in seconds, doubled on every retry. Defaults to 0.2.
 
     Attributes:
         __uri (str): The URI of the Neo4j database.
         __user (str): The username for authentication.
         __password (str): The password for authentication.
         __driver (neo4j.Driver): The Neo4j driver object.
+        __bookmarks (neo4j.Bookmarks): The bookmarks of the last write, passed on to later sessions.
+        __bookmarks_lock (threading.Lock): Guards __bookmarks, since queries may run on several threads.
 
     Methods:
         close(): Closes the connection to the Neo4j database.
         query(query, parameters=None, db=None): Executes a Cypher query on the Neo4j database.
+        read_query(query, parameters=None, db=None): Executes a read-only Cypher query, routed to followers or read replicas.
+        write_query(query, parameters=None, db=None): Executes a Cypher query that writes, routed to the leader.
+        auto_commit_query(query, parameters=None, db=None): Executes a Cypher query in an auto-commit transaction and returns its counters.
         show_databases(): Retrieves a list of all databases in the Neo4j instance.
         delete_test_data(): Deletes all nodes with a 'test' property from the Neo4j database.
         delete_all_data(): Deletes all nodes and relationships from the Neo4j database.
@@ -38,13 +59,19 @@ class Neo4jConnection:
         conn.close()
     """
 
-    def __init__(self, uri, user, pwd):
+    def __init__(self, uri, user, pwd, max_retries=5, retry_delay=0.2):
         self.__uri = uri
         self.__user = user
         self.__password = pwd
         self.__driver = None
+        self.__bookmarks = None
+        self.__bookmarks_lock = threading.Lock()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
         try:
-            self.__driver = GraphDatabase.driver(self.__uri, auth=(self.__user, self.__password))
+            # Retries are handled by _run_managed, which every managed transaction of this class goes
+            # through, so the driver's own managed-transaction retries are disabled
+            self.__driver = GraphDatabase.driver(self.__uri, auth=(self.__user, self.__password), max_transaction_retry_time=0)
         except Exception as e:
             print("Failed to create the driver:", e)
 
@@ -85,6 +112,119 @@ class Neo4jConnection:
             print("Query failed:", e)
         return response
 
+    def read_query(self, query, parameters=None, db=None):
+        """
+        Executes a read-only Cypher query in a managed read transaction.
+
+        With a routing URI (neo4j://) the query is sent to a follower or read replica.
+        The bookmarks of the last write made through this connection are passed along,
+        so the query sees that write. Reads leave the bookmarks unchanged, so a read on
+        another thread never replaces them with ones older than a concurrent write.
+
+        Args:
+            query (str): The Cypher query to execute.
+            parameters (dict, optional): The parameters to pass to the query. Defaults to None.
+            db (str, optional): The name of the database to execute the query on. Defaults to None.
+
+        Returns:
+            list: The result of the query as a list of records.
+
+        Raises:
+            AssertionError: If the driver is not initialized.
+            neo4j.exceptions.Neo4jError: If the query fails or the retries are exhausted.
+
+        Example usage:
+            conn = Neo4jConnection("neo4j://localhost:7687", "neo4j", "password")
+            result = conn.read_query("MATCH (n:BGC) RETURN n.name AS name LIMIT 10")
+            conn.close()
+        """
+        return self._run_managed(READ_ACCESS, lambda tx: list(tx.run(query, parameters)), db)
+
+    def write_query(self, query, parameters=None, db=None):
+        """
+        Executes a Cypher query in a managed write transaction.
+
+        The query is routed to the leader and its bookmarks are kept for the next
+        read or write made through this connection.
+
+        Args:
+            query (str): The Cypher query to execute.
+            parameters (dict, optional): The parameters to pass to the query. Defaults to None.
+            db (str, optional): The name of the database to execute the query on. Defaults to None.
+
+        Returns:
+            list: The result of the query as a list of records.
+
+        Raises:
+            AssertionError: If the driver is not initialized.
+            neo4j.exceptions.Neo4jError: If the query fails or the retries are exhausted.
+
+        Example usage:
+            conn = Neo4jConnection("neo4j://localhost:7687", "neo4j", "password")
+            conn.write_query("MERGE (n:BGC {name: $name})", {"name": "bgc_1"})
+            conn.close()
+        """
+        return self._run_managed(WRITE_ACCESS, lambda tx: list(tx.run(query, parameters)), db)
+
+    def auto_commit_query(self, query, parameters=None, db=None):
+        """
+        Executes a Cypher query in an auto-commit transaction and returns its summary counters.
+
+        Needed for statements that manage their own transactions, such as
+        `CALL { ... } IN TRANSACTIONS`, which cannot run inside read_query or write_query.
+
+        Args:
+            query (str): The Cypher query to execute.
+            parameters (dict, optional): The parameters to pass to the query. Defaults to None.
+            db (str, optional): The name of the database to execute the query on. Defaults to None.
+
+        Returns:
+            tuple[list, neo4j.SummaryCounters]: The records and the summary counters of the query.
+
+        Raises:
+            AssertionError: If the driver is not initialized.
+            neo4j.exceptions.Neo4jError: If the query fails.
+        """
+        assert self.__driver is not None, "Driver not initialized!"
+        with self.__driver.session(database=db, bookmarks=self._get_bookmarks()) as session:
+            result = session.run(query, parameters)
+            records = list(result)
+            counters = result.consume().counters
+            self._set_bookmarks(session.last_bookmarks())
+        return records, counters
+
+    def _get_bookmarks(self):
+        with self.__bookmarks_lock:
+            return self.__bookmarks
+
+    def _set_bookmarks(self, bookmarks):
+        with self.__bookmarks_lock:
+            self.__bookmarks = bookmarks
+
+    def _run_managed(self, access_mode, work, db):
+        """
+        Runs work(tx) in a managed transaction, retrying the errors the driver marks as retryable
+        (transient errors, leader switches, lost connections) with exponential backoff. Errors such
+        as a transaction terminated by an administrator or by its timeout are raised at once.
+        """
+        assert self.__driver is not None, "Driver not initialized!"
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.__driver.session(database=db, default_access_mode=access_mode, bookmarks=self._get_bookmarks()) as session:
+                    if access_mode == WRITE_ACCESS:
+                        response = session.execute_write(work)
+                        self._set_bookmarks(session.last_bookmarks())
+                    else:
+                        response = session.execute_read(work)
+                return response
+            except (Neo4jError, DriverError) as e:
+                if not e.is_retryable() or attempt == self.max_retries:
+                    raise
+                delay = self.retry_delay * (2 ** attempt) * (1 + random.random())
+                print(f"Retrying in {delay:.2f}s after transient error:", e)
+                time.sleep(delay)
+
     def show_databases(self):
         """
         Retrieves a list of all databases in the Neo4j instance.
@@ -153,21 +293,20 @@ class Neo4jConnection:
         """
         assert self.__driver is not None, "Driver not initialized!"
         try:
-            with self.__driver.session() as session:
-                if entity_type == 'node':
-                    result = session.execute_read(self._get_all_node_properties, entity_label)
-                elif entity_type == 'relationship':
-                    result = session.execute_read(self._get_all_relationship_properties, entity_label)
-                elif entity_type == 'constraint':
-                    result = session.execute_read(self._get_all_constraints, entity_label)
+            if entity_type == 'node':
+                result = self._run_managed(READ_ACCESS, lambda tx: self._get_all_node_properties(tx, entity_label), None)
+            elif entity_type == 'relationship':
+                result = self._run_managed(READ_ACCESS, lambda tx: self._get_all_relationship_properties(tx, entity_label), None)
+            elif entity_type == 'constraint':
+                result = self._run_managed(READ_ACCESS, lambda tx: self._get_all_constraints(tx, entity_label), None)
+            else:
+                raise ValueError(f"Invalid entity_type: {entity_type}. Must be 'node', 'relationship', or 'constraint'.")
+
+            for record in result:
+                if record:
+                    print(record)
                 else:
-                    raise ValueError(f"Invalid entity_type: {entity_type}. Must be 'node', 'relationship', or 'constraint'.")
-
-                for record in result:
-                    if record:
-                        print(record)
-                    else:
-                        print("No properties found for the given relationship.")
+                    print("No properties found for the given relationship.")
         except Exception as e:
             print(f"An error occurred: {e}")
 
@@ -204,6 +343,565 @@ class Neo4jConnection:
         return result
 
 
+# Graph records
+def quote_identifier(name):
+    """
+    Quotes a label, relationship type or property name for use in a Cypher statement.
+
+    Args:
+        name (str): The identifier.
+
+    Returns:
+        str: The identifier in backticks, with backticks inside it escaped.
+
+    Raises:
+        ValueError: If the identifier is not a non-empty string or contains a null character.
+    """
+    if not isinstance(name, str) or not name or "\x00" in name:
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return "`" + name.replace("`", "``") + "`"
+
+
+def intern_value(pool, value):
+    """
+    Returns the pooled copy of a string or tuple, so repeated values share one object.
+
+    Tuples are how labels and property keys are stored, so pooling them lets every node with
+    the same keys share one keys tuple.
+
+    Args:
+        pool (dict): The pool of already seen values.
+        value: The value to intern. Other values, and tuples that are not hashable, are returned unchanged.
+
+    Returns:
+        The pooled value.
+    """
+    if isinstance(value, str):
+        return pool.setdefault(value, value)
+    if isinstance(value, tuple):
+        try:
+            return pool.setdefault(value, value)
+        except TypeError:
+            return value
+    return value
+
+
+class NodeRecord:
+    """
+    A compact node of the graph interchange format.
+
+    Property keys are stored as a tuple shared by all nodes with the same keys and the
+    values as a tuple, which takes a fraction of the memory of a properties dictionary.
+
+    Args:
+        id (str): The node ID.
+        labels (tuple[str]): The node labels.
+        keys (tuple[str]): The property keys.
+        values (tuple): The property values, in the order of keys.
+
+    Methods:
+        from_dict(node, pool): Creates a record from a node dictionary, interning its strings.
+        to_dict(): Returns the node as a dictionary.
+    """
+
+    __slots__ = ('id', 'labels', 'keys', 'values')
+
+    def __init__(self, id, labels, keys, values):
+        self.id = id
+        self.labels = labels
+        self.keys = keys
+        self.values = values
+
+    @property
+    def properties(self):
+        return dict(zip(self.keys, self.values))
+
+    @classmethod
+    def from_dict(cls, node, pool):
+        properties = node.get('properties', {})
+        return cls(
+            node.get('id'),
+            intern_value(pool, tuple(sys.intern(label) for label in node['labels'])),
+            intern_value(pool, tuple(properties.keys())),
+            tuple(intern_value(pool, value) for value in properties.values())
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "labels": list(self.labels),
+            "properties": self.properties
+        }
+
+
+class RelationshipRecord:
+    """
+    A compact relationship of the graph interchange format.
+
+    Args:
+        source (str): The name of the source node.
+        target (str): The name of the target node.
+        type (str): The relationship type.
+        source_label (str, optional): The label of the source node, if known.
+        target_label (str, optional): The label of the target node, if known.
+        properties (dict, optional): The relationship properties, if any.
+
+    Methods:
+        from_dict(rel, pool): Creates a record from a relationship dictionary, interning its strings.
+        to_dict(): Returns the relationship as a dictionary.
+    """
+
+    __slots__ = ('source', 'target', 'type', 'source_label', 'target_label', 'properties')
+
+    def __init__(self, source, target, type, source_label=None, target_label=None, properties=None):
+        self.source = source
+        self.target = target
+        self.type = type
+        self.source_label = source_label
+        self.target_label = target_label
+        self.properties = properties
+
+    @classmethod
+    def from_dict(cls, rel, pool):
+        properties = rel.get('properties') or None
+        return cls(intern_value(pool, rel['from']), intern_value(pool, rel['to']), sys.intern(rel['type']), properties=properties)
+
+    def to_dict(self):
+        rel = {
+            'from': self.source,
+            'to': self.target,
+            'type': self.type
+        }
+        if self.properties:
+            rel['properties'] = self.properties
+        return rel
+
+
+class ColumnarRows:
+    """
+    CSV rows stored as segments of a string table and an array of row-major table indexes.
+
+    Each segment is the batch of one CSV chunk (see _parse_csv_chunk). Rows are only turned
+    back into lists of strings when iterated or indexed, with "" appended so that a missing
+    column can point past the last used column.
+
+    Args:
+        width (int): The number of values per row.
+    """
+
+    __slots__ = ('width', 'segments', 'starts', 'n_rows')
+
+    def __init__(self, width):
+        self.width = width
+        self.segments = []
+        self.starts = []
+        self.n_rows = 0
+
+    def append(self, table, indexes):
+        self.starts.append(self.n_rows)
+        self.segments.append((table, indexes))
+        self.n_rows += len(indexes) // self.width if self.width else 0
+
+    def row(self, index):
+        segment = bisect_right(self.starts, index) - 1
+        table, indexes = self.segments[segment]
+        start = (index - self.starts[segment]) * self.width
+        row = [table[position] for position in indexes[start:start + self.width]]
+        row.append("")
+        return row
+
+    def __iter__(self):
+        width = self.width
+        for table, indexes in self.segments:
+            values = list(map(table.__getitem__, indexes))
+            for start in range(0, len(values), width):
+                row = values[start:start + width]
+                row.append("")
+                yield row
+
+
+class NodeSequence(Sequence):
+    """
+    A read-only sequence of NodeRecord objects built on demand from ColumnarRows.
+
+    Every row yields one node per entry of getters, numbered 'n0', 'n1', ... in row order.
+
+    Args:
+        rows (ColumnarRows): The rows.
+        getters (list[tuple]): (labels, keys, getter) for each node of a row; getter picks the values from a row.
+    """
+
+    def __init__(self, rows, getters):
+        self.rows = rows
+        self.getters = getters
+
+    def __len__(self):
+        return self.rows.n_rows * len(self.getters)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("node index out of range")
+        row_index, k = divmod(index, len(self.getters))
+        labels, keys, getter = self.getters[k]
+        return NodeRecord(f"n{index}", labels, keys, getter(self.rows.row(row_index)))
+
+    def __iter__(self):
+        index = 0
+        for row in self.rows:
+            for labels, keys, getter in self.getters:
+                yield NodeRecord(f"n{index}", labels, keys, getter(row))
+                index += 1
+
+
+class RelationshipSequence(Sequence):
+    """
+    A read-only sequence of RelationshipRecord objects built on demand from ColumnarRows.
+
+    Args:
+        rows (ColumnarRows): The rows.
+        getters (list[tuple]): (type, source_label, target_label, source_position, target_position) for each relationship of a row.
+    """
+
+    def __init__(self, rows, getters):
+        self.rows = rows
+        self.getters = getters
+
+    def __len__(self):
+        return self.rows.n_rows * len(self.getters)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("relationship index out of range")
+        row_index, k = divmod(index, len(self.getters))
+        rel_type, source_label, target_label, source_position, target_position = self.getters[k]
+        row = self.rows.row(row_index)
+        return RelationshipRecord(row[source_position], row[target_position], rel_type, source_label, target_label)
+
+    def __iter__(self):
+        for row in self.rows:
+            for rel_type, source_label, target_label, source_position, target_position in self.getters:
+                yield RelationshipRecord(row[source_position], row[target_position], rel_type, source_label, target_label)
+
+
+def record_to_dict(record):
+    """
+    Serializes a NodeRecord or RelationshipRecord, for use as `json.dump(..., default=record_to_dict)`.
+    NodeSequence and RelationshipSequence are serialized as lists.
+    """
+    if isinstance(record, (NodeRecord, RelationshipRecord)):
+        return record.to_dict()
+    if isinstance(record, (NodeSequence, RelationshipSequence)):
+        return list(record)
+    raise TypeError(f"Object of type {type(record).__name__} is not JSON serializable")
+
+
+# Graph interchange files
+GRAPH_FILE_FORMATS = {'.json': 'json', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.msgpack': 'msgpack', '.mpk': 'msgpack'}
+GRAPH_FILE_COMPRESSIONS = ('.gz', '.zst')
+
+
+def graph_file_format(path):
+    """
+    Detects the format and compression of a graph interchange file from its extension.
+
+    Supported formats are .json (a single object with 'nodes' and 'relationships'), .jsonl/.ndjson
+    (one node or relationship per line) and .msgpack/.mpk (a stream of compact arrays, see
+    ParseData.write_graph_file), each optionally compressed with .gz or .zst.
+
+    Args:
+        path (str): The file path, e.g. 'payload.jsonl.zst'.
+
+    Returns:
+        tuple[str, str]: The format and the compression ('.gz', '.zst' or None).
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    root, extension = os.path.splitext(path.lower())
+    compression = None
+    if extension in GRAPH_FILE_COMPRESSIONS:
+        compression = extension
+        root, extension = os.path.splitext(root)
+    if extension not in GRAPH_FILE_FORMATS:
+        raise ValueError(f"Unsupported graph file extension: {path}")
+    return GRAPH_FILE_FORMATS[extension], compression
+
+
+def _open_graph_file(path, mode, compression):
+    """
+    Opens a graph interchange file in binary mode ('rb' or 'wb'), decompressing or compressing it.
+    """
+    if compression == '.gz':
+        return gzip.open(path, mode)
+    if compression == '.zst':
+        if zstandard is None:
+            raise ImportError("Reading or writing .zst files requires the zstandard package: pip install zstandard")
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    return open(path, mode)
+
+
+# Statement templates
+class StatementTemplates:
+    """
+    A registry of parameterized Cypher statements, built once per (label, type, key) shape.
+
+    Labels, relationship types and property keys are validated and backtick-quoted with
+    quote_identifier; every value is passed as a parameter. A given shape always yields the
+    same statement text, so the server plans it once and then reuses the cached plan.
+
+    Methods:
+        merge_node(label, key): MERGE a node on $key and SET n += $props.
+        merge_node_on_properties(label, keys): MERGE a node on all the given keys of $props.
+        create_unique_constraint(name, label, key): CREATE a uniqueness constraint IF NOT EXISTS.
+        merge_relationship(rel_type, source_label, target_label, key): MERGE a relationship between nodes matched on $source and $target.
+        merge_relationship_by_property(from_label, to_label, from_property, to_property, rel_type): MERGE relationships between nodes sharing a property value.
+        delete_relationship(rel_type, key): DELETE a relationship between nodes matched on $source and $target.
+        unwind_merge_nodes(label, key): MERGE a batch of $rows of {key, properties}.
+        unwind_merge_relationships(rel_type, source_label, target_label, key): MERGE a batch of $rows of {source, target, properties}.
+        get_nodes_by_keys(label, key): RETURN the nodes matching a list of $keys.
+        get_neighborhoods(label, key, rel_types, depth): RETURN one keyset page of the nodes within depth hops of a list of $keys.
+        stats(): Returns the number of distinct statements and how often each was looked up.
+
+    Example usage:
+        templates = StatementTemplates()
+        conn.write_query(templates.merge_node("BGC"), {"key": "bgc_1", "props": {"name": "bgc_1"}})
+    """
+
+    def __init__(self):
+        self._statements = {}
+        self._uses = {}
+        self._lock = threading.Lock()
+
+    def _get(self, shape, build):
+        with self._lock:
+            statement = self._statements.get(shape)
+            if statement is None:
+                statement = self._statements[shape] = build()
+                self._uses[shape] = 0
+            self._uses[shape] += 1
+        return statement
+
+    @staticmethod
+    def _node_pattern(variable, label):
+        return f"{variable}:{quote_identifier(label)}" if label else variable
+
+    def merge_node(self, label, key='name'):
+        return self._get(('merge_node', label, key), lambda: f"""
+            MERGE (n:{quote_identifier(label)} {{{quote_identifier(key)}: $key}})
+            SET n += $props
+            """)
+
+    def merge_node_on_properties(self, label, keys):
+        keys = tuple(keys)
+
+        def build():
+            pattern = ', '.join(f"{quote_identifier(key)}: $props.{quote_identifier(key)}" for key in keys)
+            return f"""
+            MERGE (n:{quote_identifier(label)} {{{pattern}}})
+            """
+        return self._get(('merge_node_on_properties', label, keys), build)
+
+    def create_unique_constraint(self, name, label, key):
+        return self._get(('create_unique_constraint', name, label, key), lambda: f"""
+            CREATE CONSTRAINT {quote_identifier(name)} IF NOT EXISTS
+            FOR (n:{quote_identifier(label)}) REQUIRE n.{quote_identifier(key)} IS UNIQUE
+            """)
+
+    def merge_relationship(self, rel_type, source_label=None, target_label=None, key='name'):
+        return self._get(('merge_relationship', rel_type, source_label, target_label, key), lambda: f"""
+            MATCH ({self._node_pattern('a', source_label)} {{{quote_identifier(key)}: $source}})
+            MATCH ({self._node_pattern('b', target_label)} {{{quote_identifier(key)}: $target}})
+            MERGE (a)-[r:{quote_identifier(rel_type)}]->(b)
+            SET r += $props
+            """)
+
+    def merge_relationship_by_property(self, from_label, to_label, from_property, to_property, rel_type):
+        return self._get(('merge_relationship_by_property', from_label, to_label, from_property, to_property, rel_type), lambda: f"""
+            MATCH (a:{quote_identifier(from_label)}), (b:{quote_identifier(to_label)})
+            WHERE a.{quote_identifier(from_property)} = b.{quote_identifier(to_property)}
+            MERGE (a)-[r:{quote_identifier(rel_type)}]->(b)
+            SET r += $props
+            """)
+
+    def delete_relationship(self, rel_type, key='id'):
+        return self._get(('delete_relationship', rel_type, key), lambda: f"""
+            MATCH (a {{{quote_identifier(key)}: $source}})-[r:{quote_identifier(rel_type)}]->(b {{{quote_identifier(key)}: $target}})
+            DELETE r
+            """)
+
+    def unwind_merge_nodes(self, label, key='name'):
+        return self._get(('unwind_merge_nodes', label, key), lambda: f"""
+            UNWIND $rows AS row
+            MERGE (n:{quote_identifier(label)} {{{quote_identifier(key)}: row.key}})
+            SET n += row.properties
+            """)
+
+    def unwind_merge_relationships(self, rel_type, source_label=None, target_label=None, key='name'):
+        return self._get(('unwind_merge_relationships', rel_type, source_label, target_label, key), lambda: f"""
+            UNWIND $rows AS row
+            MATCH ({self._node_pattern('a', source_label)} {{{quote_identifier(key)}: row.source}})
+            MATCH ({self._node_pattern('b', target_label)} {{{quote_identifier(key)}: row.target}})
+            MERGE (a)-[r:{quote_identifier(rel_type)}]->(b)
+            SET r += row.properties
+            """)
+
+    def get_nodes_by_keys(self, label, key='name'):
+        return self._get(('get_nodes_by_keys', label, key), lambda: f"""
+            UNWIND $keys AS k
+            MATCH (n:{quote_identifier(label)} {{{quote_identifier(key)}: k}})
+            RETURN k AS key, properties(n) AS properties
+            """)
+
+    def get_neighborhoods(self, label, key='name', rel_types=(), depth=1):
+        # A bare string would otherwise be split into one relationship type per character
+        if isinstance(rel_types, str):
+            raise ValueError(f"rel_types must be a list of relationship types, not the string {rel_types!r}")
+        rel_types = tuple(rel_types)
+
+        def build():
+            if isinstance(depth, bool) or not isinstance(depth, int) or depth < 1:
+                raise ValueError(f"Invalid depth: {depth!r}")
+            types = ":" + "|".join(quote_identifier(rel_type) for rel_type in rel_types) if rel_types else ""
+            # Keys before the page are dropped before the MATCH, so earlier keys are not expanded again;
+            # a null $after_key marks the first page
+            return f"""
+            UNWIND $keys AS k
+            WITH k WHERE $after_key IS NULL OR k >= $after_key
+            MATCH (n:{quote_identifier(label)} {{{quote_identifier(key)}: k}})-[{types}*1..{depth}]-(m)
+            WITH DISTINCT k, m, elementId(m) AS id
+            WHERE $after_key IS NULL OR k > $after_key OR id > $after_id
+            RETURN k AS key, id, labels(m) AS labels, properties(m) AS properties
+            ORDER BY key, id
+            LIMIT $page_size
+            """
+        return self._get(('get_neighborhoods', label, key, rel_types, depth), build)
+
+    def stats(self):
+        """
+        Returns the template statistics.
+
+        Returns:
+            dict: 'statements' is the number of distinct statement texts (the plans the server
+            has to build), 'lookups' the number of times a statement was requested, 'reuse_ratio'
+            the share of lookups that reused an existing statement, and 'by_shape' the lookups per shape.
+        """
+        with self._lock:
+            lookups = sum(self._uses.values())
+            return {
+                'statements': len(self._statements),
+                'lookups': lookups,
+                'reuse_ratio': 1 - len(self._statements) / lookups if lookups else 0.0,
+                'by_shape': dict(self._uses)
+            }
+
+
+# Taxonomy
+TAXONOMY_RANKS = {
+    'd': 'domain',
+    'p': 'phylum',
+    'c': 'class',
+    'o': 'order',
+    'f': 'family',
+    'g': 'genus',
+    's': 'species'
+}
+
+
+class TaxonNode:
+    """
+    A rank node of the taxonomy trie.
+
+    Args:
+        rank (str): The rank, e.g. 'order'.
+        name (str): The name at that rank, without the rank prefix, e.g. 'SAR86'.
+        lineage (str): The lineage prefix ending at this node, which identifies it.
+        parent (TaxonNode, optional): The parent node, None for a domain.
+    """
+
+    __slots__ = ('rank', 'name', 'lineage', 'parent', 'children')
+
+    def __init__(self, rank, name, lineage, parent=None):
+        self.rank = rank
+        self.name = name
+        self.lineage = lineage
+        self.parent = parent
+        self.children = {}
+
+
+class TaxonomyTrie:
+    """
+    Splits GTDB-style lineages ('d__Bacteria;p__Proteobacteria;...;s__') into rank nodes,
+    sharing common prefixes so that each rank node is created once.
+
+    Empty ranks such as a trailing 's__' end the lineage.
+
+    Attributes:
+        roots (dict): The domain nodes by name.
+        levels (list[list[TaxonNode]]): The nodes by depth, in insertion order.
+        leaves (dict): The deepest node of every lineage added, by lineage.
+
+    Methods:
+        add(lineage): Adds a lineage and returns its deepest node.
+
+    Example usage:
+        trie = TaxonomyTrie()
+        trie.add("d__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;o__SAR86;f__D2472;g__D2472;s__")
+    """
+
+    def __init__(self):
+        self.roots = {}
+        self.levels = []
+        self.leaves = {}
+
+    def add(self, lineage):
+        """
+        Adds a lineage to the trie, creating only the rank nodes not seen before.
+
+        Args:
+            lineage (str): The semicolon separated lineage.
+
+        Returns:
+            TaxonNode: The deepest node of the lineage, or None if it has no named rank.
+        """
+        if lineage in self.leaves:
+            return self.leaves[lineage]
+
+        node = None
+        children = self.roots
+        prefix = []
+        for depth, token in enumerate(lineage.split(';')):
+            token = token.strip()
+            code, separator, name = token.partition('__')
+            if not separator:
+                code, name = '', token
+            if not name:
+                break
+            prefix.append(token)
+            child = children.get(token)
+            if child is None:
+                rank = TAXONOMY_RANKS.get(code, code or f"rank_{depth}")
+                child = TaxonNode(rank, name, ';'.join(prefix), node)
+                children[token] = child
+                if len(self.levels) <= depth:
+                    self.levels.append([])
+                self.levels[depth].append(child)
+            node = child
+            children = node.children
+
+        self.leaves[lineage] = node
+        return node
+
+
 # Graph functions
 class GraphGenerator:
     """
@@ -214,10 +912,20 @@ class GraphGenerator:
 
     Attributes:
         neo4j_conn (Neo4jConnection): The Neo4j connection object.
+        templates (StatementTemplates): The parameterized statements used for merges and deletes.
+
+    Writes are sent through `neo4j_conn.write_query`, so they are routed to the leader and retried on
+    retryable errors. The batched lookups and progress polls use `neo4j_conn.read_query`, which may be
+    routed to a follower or read replica, and the LOAD CSV statements of generate_from_csv use
+    `neo4j_conn.auto_commit_query`, since `CALL { ... } IN TRANSACTIONS` manages its own transactions.
 
     Methods:
         execute(schema, data): Generates nodes and relationships in the Neo4j database based on the provided schema and data.
         execute_from_json(json_path): Generates nodes and relationships in the Neo4j database based on a JSON file.
+        generate_taxonomy(lineages, batch_size=1000): Expands taxonomy lineages into rank nodes linked by PARENT_OF.
+        generate_from_csv(csv_url, schema_json_path, batch_size=1000): Loads a CSV server-side with LOAD CSV using the schema.json mapping.
+        get_nodes_by_keys(label, keys, key='name'): Fetches many nodes by key in batched UNWIND queries.
+        get_neighborhoods(label, keys, rel_types=(), depth=1): Fetches the neighborhoods of many nodes with keyset pagination.
 
     Example usage:
         conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
@@ -228,6 +936,7 @@ class GraphGenerator:
 
     def __init__(self, neo4j_conn):
         self.neo4j_conn = neo4j_conn
+        self.templates = StatementTemplates()
 
     def execute(self, schema, data):
         """
@@ -276,12 +985,17 @@ class GraphGenerator:
         except Exception as e:
             print("Execution had an error: ", e)
 
-    def generate_from_json(self, json_path):
+    def generate_from_json(self, json_path, taxonomy=False):
         """
         Generates nodes and relationships in the Neo4j database based on a JSON file.
 
+        The file may also be JSON Lines or msgpack, optionally gzip or zstd compressed,
+        detected from the extension (see graph_file_format); it is read in streamed chunks.
+
         Args:
-            json_path (str): The path to the JSON file containing the data.
+            json_path (str): The path to the file containing the data, e.g. 'payload.json' or 'payload.jsonl.zst'.
+            taxonomy (bool, optional): Whether to also expand the names of the Taxonomy nodes into
+                rank nodes (see generate_taxonomy) once the file is loaded. Defaults to False.
 
         Returns:
             None
@@ -293,67 +1007,43 @@ class GraphGenerator:
             generator = GraphGenerator(conn)
             generator.generate_from_json("data.json")
         """
-        # Load the JSON data
-        with open(json_path, 'r') as file:
-            data = json.load(file)
-
-        nodes = data['nodes']
-        relationships = data['relationships']
-
-        # Generate Nodes using MERGE
-        for node in nodes:
-            labels = node['labels'][0]  # Assuming only the first node label
-            unique_identifier_key = 'name'  # Adjust if your unique identifier key is different
-
-            # Ensure there's a unique identifier for the node. If not, skip or handle accordingly.
-            if unique_identifier_key not in node['properties']:
-                print(f"Skipping node without unique identifier: {node}")
-                continue
-
-            properties = node['properties']
-
-            # Preparing the parameters for the query
-            parameters = {prop: properties[prop] for prop in properties}
-
-            # The MERGE statement with placeholders for the unique identifier and properties
-            merge_query = f"""
-                MERGE (n:{labels} {{name: $name}})
-                ON CREATE SET n += $properties
-                ON MATCH SET n += $properties
-                RETURN n
-            """
-            # Execute the MERGE query with parameters
-            #print(parameters)
-            self.neo4j_conn.query(merge_query, parameters={'name': properties.get('name'), 'properties': parameters})
-
-        # Generate Relationships using MERGE
-        for rel in relationships:
-            # Extract 'from' and 'to' IDs for source and target nodes and relationship type
-            source_id = rel['from']
-            target_id = rel['to']
-            rel_type = rel['type']
-
-            # Assuming relationships could have properties.
-            # Here's a placeholder to construct a properties string if they existed.
-            #rel_properties = {}  # Placeholder for relationship properties if any
-            #set_clause_str = ", ".join([f"r.{key} = ${key}" for key in rel_properties.keys()])
-
-            # If there are no properties to set, the SET clauses should be omitted.
-            #on_create_set_clause = f"ON CREATE SET {set_clause_str}" if set_clause_str else ""
-            #on_match_set_clause = f"ON MATCH SET {set_clause_str}" if set_clause_str else ""
-
-            # Constructing and executing the MERGE query
-            cypher_query = (
-                f"""MATCH (a), (b)
-                WHERE a.name = "{source_id}" AND b.name = "{target_id}"
-                MERGE (a)-[r:{rel_type}]->(b)
-                RETURN a, r, b
-                """
-            )
-                #f"{on_create_set_clause} "
-                #f"{on_match_set_clause} "
-            self.neo4j_conn.query(cypher_query)
+        # Stream the file as chunks of compact records; files list nodes before relationships
+        trie = TaxonomyTrie() if taxonomy else None
+        for records in ParseData.iter_graph_file(json_path):
+            nodes = [record for record in records if isinstance(record, NodeRecord)]
+            relationships = [record for record in records if isinstance(record, RelationshipRecord)]
+
+            # Generate Nodes using MERGE
+            for node in nodes:
+                labels = node.labels[0]  # Assuming only the first node label
+                unique_identifier_key = 'name'  # Adjust if your unique identifier key is different
+
+                # Ensure there's a unique identifier for the node. If not, skip or handle accordingly.
+                if unique_identifier_key not in node.keys:
+                    print(f"Skipping node without unique identifier: {node.to_dict()}")
+                    continue
+
+                properties = node.properties
+                if trie is not None and labels == 'Taxonomy':
+                    trie.add(properties[unique_identifier_key])
+
+                # The MERGE statement is shared by every node with this label; values are parameters
+                merge_query = self.templates.merge_node(labels, unique_identifier_key)
+                self.neo4j_conn.write_query(merge_query, parameters={'key': properties[unique_identifier_key], 'props': properties})
+
+            # Generate Relationships using MERGE
+            for rel in relationships:
+                # Extract 'from' and 'to' IDs for source and target nodes and relationship type
+                source_id = rel.source
+                target_id = rel.target
+                rel_type = rel.type
+
+                # The MERGE statement is shared by every relationship of this type; names are parameters
+                cypher_query = self.templates.merge_relationship(rel_type, rel.source_label, rel.target_label)
+                self.neo4j_conn.write_query(cypher_query, {"source": source_id, "target": target_id, "props": rel.properties or {}})
         print("Nodes and relationships have been created from JSON.")
+        if trie is not None:
+            self.write_taxonomy(trie)
 
     def generate_nodes(self, schema, data):
         """
@@ -375,24 +1065,379 @@ class GraphGenerator:
         """ 
         for node in schema['nodes']:
             node_label = node['labels'][0]  # Assuming each node dictionary has a 'labels' list with at least one label
-            node_properties = node['properties']
+            # The node is matched on its 'id' and every schema property; names are quoted by the template
+            node_keys = ['id'] + [prop for prop in node['properties'] if prop != 'id']
+            cypher_query = self.templates.merge_node_on_properties(node_label, node_keys)
             for node_data in data.get(node_label, []):
-                # Construct a dictionary of property assignments for Cypher query
-                node_props = ', '.join([f"{prop}: ${prop}" for prop in node_properties])
                 # Assuming 'id' or another unique identifier is part of node_data to distinguish nodes
                 node_id = node_data.get('id')  
                 if node_id:  # Ensuring there is an identifier to match nodes in the database
-                    # Use MERGE to create or update nodes based on unique identifier
-                    cypher_query = f"MERGE (n:{node_label} {{id: $id, {node_props} }})"
                     # Assuming node_data is a dictionary with property values, including the 'id'
-                    self.neo4j_conn.query(cypher_query, parameters=node_data)
+                    self.neo4j_conn.write_query(cypher_query, parameters={'props': node_data})
 
     def generate_constraints(self, schema):
         for constraint_name, constraint_data in schema['constraints'].items():
             label = constraint_data['label']
             property_name = constraint_data['property']
-            cypher_query = f"CREATE CONSTRAINT {constraint_name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{property_name} IS UNIQUE;"
-            self.neo4j_conn.query(cypher_query)
+            cypher_query = self.templates.create_unique_constraint(constraint_name, label, property_name)
+            self.neo4j_conn.write_query(cypher_query)
+
+    LOAD_CSV_COUNTERS = ('nodes_created', 'relationships_created', 'properties_set', 'labels_added', 'indexes_added')
+
+    def build_load_csv_statements(self, schema, batch_size: int = 1000):
+        """
+        Builds `LOAD CSV WITH HEADERS` statements from a schema.json mapping.
+
+        Every node label becomes a statement that merges on 'name', taken from the column named
+        after the label, and sets the other mapped properties from the columns of the same name.
+        Every relationship becomes a statement that matches its source and target nodes by name.
+        Rows with an empty key column are skipped. The CSV URL is passed as the $url parameter.
+
+        Args:
+            schema (dict): The schema with 'nodes' and 'relationships', as in schema.json.
+            batch_size (int, optional): The number of rows committed per inner transaction. Defaults to 1000.
+
+        Returns:
+            list[tuple[str, object, str]]: The (kind, target, statement) of every index, node and relationship
+            statement, where the target is the label, or (source label, type, target label) for a relationship.
+        """
+        statements = []
+        id_to_label = {}
+        for node in schema['nodes']:
+            label = node['labels'][0]
+            id_to_label[node['id']] = label
+            statements.append(('index', label, f"CREATE INDEX IF NOT EXISTS FOR (n:{quote_identifier(label)}) ON (n.name)"))
+
+        for node in schema['nodes']:
+            label = node['labels'][0]
+            column = quote_identifier(label)
+            assignments = [f"n.{quote_identifier(prop)} = row.{quote_identifier(prop)}" for prop in node['properties'] if prop != 'name']
+            set_clause = "SET " + ", ".join(assignments) if assignments else ""
+            statements.append(('node', label, f"""
+                LOAD CSV WITH HEADERS FROM $url AS row
+                CALL {{
+                    WITH row
+                    WITH row WHERE row.{column} IS NOT NULL
+                    MERGE (n:{quote_identifier(label)} {{name: row.{column}}})
+                    {set_clause}
+                }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+                """))
+
+        for rel in schema.get('relationships', []):
+            from_label = id_to_label[rel['fromId']]
+            to_label = id_to_label[rel['toId']]
+            statements.append(('relationship', (from_label, rel['type'], to_label), f"""
+                LOAD CSV WITH HEADERS FROM $url AS row
+                CALL {{
+                    WITH row
+                    WITH row WHERE row.{quote_identifier(from_label)} IS NOT NULL AND row.{quote_identifier(to_label)} IS NOT NULL
+                    MATCH (a:{quote_identifier(from_label)} {{name: row.{quote_identifier(from_label)}}})
+                    MATCH (b:{quote_identifier(to_label)} {{name: row.{quote_identifier(to_label)}}})
+                    MERGE (a)-[r:{quote_identifier(rel['type'])}]->(b)
+                }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+                """))
+        return statements
+
+    def generate_from_csv(self, csv_url: str, schema_json_path: str, batch_size: int = 1000, progress_interval: float = 5.0, db: str = None, taxonomy: bool = False):
+        """
+        Loads a CSV file server-side with `LOAD CSV ... CALL { ... } IN TRANSACTIONS`, using the schema.json mapping.
+
+        A drop-in alternative to CSVGraphAdapter and generate_from_json for files the server can
+        reach: no row goes through the Python driver. While a statement runs, the number of nodes
+        or relationships it targets (by type and endpoint labels) is polled and printed every
+        progress_interval seconds.
+
+        Args:
+            csv_url (str): The CSV URL, e.g. 'file:///Microbiomics_BGC_dataset_test.csv' for a file in the
+                import directory or an https:// URL. A value without a scheme is read as a file in the import directory.
+            schema_json_path (str): The path to the schema JSON file.
+            batch_size (int, optional): The number of rows committed per inner transaction. Defaults to 1000.
+            progress_interval (float, optional): Seconds between progress polls, None to disable. Defaults to 5.0.
+            db (str, optional): The name of the database. Defaults to None.
+            taxonomy (bool, optional): Whether to also expand the loaded Taxonomy node names into rank
+                nodes (see generate_taxonomy). The rows never reach Python, so the distinct names are
+                read back once the load is done. Defaults to False.
+
+        Returns:
+            dict: The summary counters of every statement by 'kind:label', or 'relationship:Source-TYPE->Target'
+            for relationships, and their sum under 'total'.
+
+        Example usage:
+            generator = GraphGenerator(conn)
+            summary = generator.generate_from_csv("file:///Microbiomics_BGC_dataset_test.csv", "schema.json")
+        """
+        if "://" not in csv_url:
+            csv_url = "file:///" + csv_url.lstrip("/")
+        with open(schema_json_path) as json_file:
+            schema = json.load(json_file)
+
+        summary = {"total": dict.fromkeys(self.LOAD_CSV_COUNTERS, 0)}
+        for kind, target, statement in self.build_load_csv_statements(schema, batch_size):
+            # Relationships of one type may link different labels, e.g. Genome-CONTAINS->BGC and Taxonomy-CONTAINS->BGC
+            name = "{}-{}->{}".format(*target) if kind == 'relationship' else target
+            stop = threading.Event()
+            poller = None
+            if kind != 'index' and progress_interval:
+                poller = threading.Thread(target=self._poll_load_csv_progress, args=(kind, target, progress_interval, stop, db), daemon=True)
+                poller.start()
+            try:
+                _, counters = self.neo4j_conn.auto_commit_query(statement, {"url": csv_url}, db=db)
+            finally:
+                stop.set()
+                if poller is not None:
+                    poller.join()
+
+            counts = {counter: getattr(counters, counter) for counter in self.LOAD_CSV_COUNTERS}
+            summary[f"{kind}:{name}"] = counts
+            for counter, value in counts.items():
+                summary["total"][counter] += value
+
+        print(f"CSV loaded from {csv_url}: {summary['total']}")
+        if taxonomy:
+            records = self.neo4j_conn.read_query("MATCH (t:Taxonomy) RETURN t.name AS name", db=db)
+            self.generate_taxonomy(record['name'] for record in records if record['name'])
+        return summary
+
+    def _poll_load_csv_progress(self, kind, target, interval, stop, db):
+        """
+        Prints the number of nodes with a label, or relationships of a type between two labels, until stop is set.
+        """
+        if kind == 'node':
+            name = target
+            query = f"MATCH (n:{quote_identifier(target)}) RETURN count(n) AS count"
+        else:
+            from_label, rel_type, to_label = target
+            name = f"{from_label}-{rel_type}->{to_label}"
+            query = f"MATCH (:{quote_identifier(from_label)})-[r:{quote_identifier(rel_type)}]->(:{quote_identifier(to_label)}) RETURN count(r) AS count"
+        while not stop.wait(interval):
+            try:
+                count = self.neo4j_conn.read_query(query, db=db)[0]['count']
+                print(f"Loading {kind} {name}: {count} in the database")
+            except Exception as e:
+                print("Progress poll failed:", e)
+
+    def statement_stats(self):
+        """
+        Returns the statement template statistics, see StatementTemplates.stats().
+
+        Returns:
+            dict: The number of distinct statements, lookups and the reuse ratio.
+        """
+        return self.templates.stats()
+
+    def get_nodes_by_keys(self, label: str, keys, key: str = 'name', batch_size: int = 10000, db: str = None) -> dict:
+        """
+        Fetches many nodes by key, with one UNWIND round trip per batch_size keys.
+
+        Args:
+            label (str): The node label.
+            keys (iterable): The key values to look up.
+            key (str, optional): The key property. Defaults to 'name'.
+            batch_size (int, optional): The number of keys sent per query. Defaults to 10000.
+            db (str, optional): The name of the database. Defaults to None.
+
+        Returns:
+            dict: The properties of each node found, by key. Missing keys are left out.
+
+        Example usage:
+            generator = GraphGenerator(conn)
+            compounds = generator.get_nodes_by_keys("Compound", ["cpd00001", "cpd00002"], key="id")
+        """
+        keys = list(dict.fromkeys(keys))
+        statement = self.templates.get_nodes_by_keys(label, key)
+        nodes = {}
+        for start in range(0, len(keys), batch_size):
+            for record in self.neo4j_conn.read_query(statement, {"keys": keys[start:start + batch_size]}, db=db):
+                nodes[record["key"]] = record["properties"]
+        return nodes
+
+    def get_neighborhoods(self, label: str, keys, rel_types=(), depth: int = 1, key: str = 'name', batch_size: int = 1000, page_size: int = 10000, db: str = None) -> dict:
+        """
+        Fetches the nodes within depth hops of many nodes, in either direction, as columns.
+
+        Keys are sent batch_size at a time in one UNWIND query, and each batch is read in pages of
+        page_size rows with keyset pagination on (key, elementId), so large neighborhoods never
+        come back in one result. Each page only expands the keys from the last key read onwards.
+        Keys of different types are sent in separate batches, since Cypher does not compare them.
+
+        Args:
+            label (str): The label of the start nodes.
+            keys (iterable): The key values of the start nodes.
+            rel_types (iterable[str], optional): The relationship types to follow, all types if empty. Defaults to ().
+            depth (int, optional): The maximum number of hops. Defaults to 1.
+            key (str, optional): The key property of the start nodes. Defaults to 'name'.
+            batch_size (int, optional): The number of keys sent per query. Defaults to 1000.
+            page_size (int, optional): The maximum number of rows per page. Defaults to 10000.
+            db (str, optional): The name of the database. Defaults to None.
+
+        Returns:
+            dict: Equal-length 'key', 'id', 'labels' and 'properties' lists, one row per
+            (start key, neighbor) pair, ordered by key and element ID within each batch.
+
+        Raises:
+            ValueError: If rel_types is a string rather than a list of types, or depth is not a positive integer.
+
+        Example usage:
+            generator = GraphGenerator(conn)
+            neighborhoods = generator.get_neighborhoods("BGC", bgc_names, rel_types=["CONTAINS", "PRODUCES"])
+        """
+        keys_by_type = {}
+        for value in dict.fromkeys(keys):
+            keys_by_type.setdefault(type(value), []).append(value)
+        statement = self.templates.get_neighborhoods(label, key, rel_types, depth)
+        columns = {"key": [], "id": [], "labels": [], "properties": []}
+        batches = (group[start:start + batch_size] for group in keys_by_type.values() for start in range(0, len(group), batch_size))
+        for batch in batches:
+            after_key, after_id = None, None
+            while True:
+                records = self.neo4j_conn.read_query(
+                    statement,
+                    {"keys": batch, "after_key": after_key, "after_id": after_id, "page_size": page_size},
+                    db=db,
+                )
+                for record in records:
+                    for column in columns:
+                        columns[column].append(record[column])
+                if len(records) < page_size:
+                    break
+                after_key, after_id = records[-1]["key"], records[-1]["id"]
+        return columns
+
+    def generate_name_indexes(self, labels):
+        """
+        Creates an index on 'name' for every label, as used to merge and match nodes by name.
+
+        Args:
+            labels (iterable[str]): The node labels.
+
+        Returns:
+            None
+        """
+        for label in labels:
+            self.neo4j_conn.write_query(f"CREATE INDEX IF NOT EXISTS FOR (n:{quote_identifier(label)}) ON (n.name)")
+
+    def write_records(self, nodes, relationships):
+        """
+        Merges a batch of NodeRecord and RelationshipRecord objects with one UNWIND statement per label and type.
+
+        Nodes are merged on 'name' like generate_from_json and written before the relationships,
+        so a batch may reference its own nodes. Relationships with known source and target labels
+        match their nodes through the label indexes.
+
+        Args:
+            nodes (iterable[NodeRecord]): The nodes to merge.
+            relationships (iterable[RelationshipRecord]): The relationships to merge.
+
+        Returns:
+            None
+        """
+        nodes_by_label = {}
+        for node in nodes:
+            properties = node.properties
+            if properties.get('name'):
+                nodes_by_label.setdefault(node.labels[0], []).append({"key": properties['name'], "properties": properties})
+        for label, rows in nodes_by_label.items():
+            self.neo4j_conn.write_query(self.templates.unwind_merge_nodes(label), {"rows": rows})
+
+        relationships_by_shape = {}
+        for rel in relationships:
+            shape = (rel.type, rel.source_label, rel.target_label)
+            relationships_by_shape.setdefault(shape, []).append({"source": rel.source, "target": rel.target, "properties": rel.properties or {}})
+        for (rel_type, source_label, target_label), rows in relationships_by_shape.items():
+            self.neo4j_conn.write_query(self.templates.unwind_merge_relationships(rel_type, source_label, target_label), {"rows": rows})
+
+    def generate_taxonomy_indexes(self):
+        """
+        Creates the constraint and indexes used by the taxonomy rank nodes.
+
+        Returns:
+            None
+        """
+        self.neo4j_conn.write_query("CREATE CONSTRAINT taxon_lineage IF NOT EXISTS FOR (t:Taxon) REQUIRE t.lineage IS UNIQUE")
+        self.neo4j_conn.write_query("CREATE INDEX taxon_rank_name IF NOT EXISTS FOR (t:Taxon) ON (t.rank, t.name)")
+        self.neo4j_conn.write_query("CREATE INDEX taxon_name IF NOT EXISTS FOR (t:Taxon) ON (t.name)")
+        self.neo4j_conn.write_query("CREATE INDEX taxonomy_name IF NOT EXISTS FOR (t:Taxonomy) ON (t.name)")
+
+    def generate_taxonomy(self, lineages, batch_size: int = 1000):
+        """
+        Expands taxonomy lineages into (:Taxon) rank nodes linked by PARENT_OF, from domain to species.
+
+        Shared prefixes are deduplicated with a TaxonomyTrie, so each rank node is written once per run.
+        Levels are written in order in batches of batch_size, so parents always exist before their
+        children. The deepest rank node of each lineage is linked to the (:Taxonomy {name: lineage})
+        node created by generate_from_json, if present.
+
+        generate_from_json, generate_from_csv and IngestionPipeline do this as part of the
+        ingestion when called with taxonomy=True.
+
+        Args:
+            lineages (iterable[str]): The lineages, e.g. the 'Taxonomy' column of the BGC dataset.
+            batch_size (int, optional): The number of rows sent per statement. Defaults to 1000.
+
+        Returns:
+            TaxonomyTrie: The trie built from the lineages.
+
+        Example usage:
+            generator = GraphGenerator(conn)
+            generator.generate_taxonomy(["d__Bacteria;p__Proteobacteria;c__Gammaproteobacteria;o__SAR86;f__D2472;g__D2472;s__"])
+            conn.read_query(
+                "MATCH (:Taxon {rank: 'order', name: 'SAR86'})-[:PARENT_OF*]->(:Taxonomy)-[:CONTAINS]->(b:BGC) RETURN b.name"
+            )
+        """
+        trie = TaxonomyTrie()
+        for lineage in lineages:
+            trie.add(lineage)
+        return self.write_taxonomy(trie, batch_size)
+
+    def write_taxonomy(self, trie, batch_size: int = 1000):
+        """
+        Writes the rank nodes of a TaxonomyTrie level by level and links each leaf to its (:Taxonomy) node.
+
+        Used by generate_taxonomy, and by the ingestion paths with taxonomy=True, which fill the
+        trie while their rows stream past and write it once they are done.
+
+        Args:
+            trie (TaxonomyTrie): The trie to write.
+            batch_size (int, optional): The number of rows sent per statement. Defaults to 1000.
+
+        Returns:
+            TaxonomyTrie: The trie.
+        """
+        self.generate_taxonomy_indexes()
+
+        for level in trie.levels:
+            rows = [{
+                "lineage": node.lineage,
+                "rank": node.rank,
+                "name": node.name,
+                "parent": node.parent.lineage if node.parent is not None else None
+            } for node in level]
+            for start in range(0, len(rows), batch_size):
+                self.neo4j_conn.write_query(
+                    """
+                    UNWIND $rows AS row
+                    MERGE (t:Taxon {lineage: row.lineage})
+                    SET t.rank = row.rank, t.name = row.name
+                    WITH t, row
+                    WHERE row.parent IS NOT NULL
+                    MATCH (p:Taxon {lineage: row.parent})
+                    MERGE (p)-[:PARENT_OF]->(t)
+                    """,
+                    {"rows": rows[start:start + batch_size]},
+                )
+
+        leaves = [{"lineage": lineage, "leaf": node.lineage} for lineage, node in trie.leaves.items() if node is not None]
+        for start in range(0, len(leaves), batch_size):
+            self.neo4j_conn.write_query(
+                """
+                UNWIND $rows AS row
+                MATCH (leaf:Taxon {lineage: row.leaf}), (t:Taxonomy {name: row.lineage})
+                MERGE (leaf)-[:PARENT_OF]->(t)
+                """,
+                {"rows": leaves[start:start + batch_size]},
+            )
+        print(f"Taxonomy of {len(trie.leaves)} lineages expanded into {sum(len(level) for level in trie.levels)} rank nodes.")
+        return trie
 
     def merge_node_from_dict(self, node_label: str, node_dict: dict={}):
         """
@@ -406,12 +1451,9 @@ class GraphGenerator:
             None
         """
         try:
-            self.neo4j_conn.query(
-                f"""
-                MERGE (n:{node_label} {{id: $id}})
-                SET n += $props
-                """,
-                {"id": node_dict["id"], "props": node_dict},
+            self.neo4j_conn.write_query(
+                self.templates.merge_node(node_label, 'id'),
+                {"key": node_dict["id"], "props": node_dict},
             )
         except Exception as e:
             print("Execution had an error: ", e)
@@ -431,14 +1473,9 @@ class GraphGenerator:
             None
         """
         try:
-            self.neo4j_conn.query(
-                f"""
-                MATCH (a), (b)
-                WHERE a.id = $from_node_id AND b.id = $to_node_id
-                MERGE (a)-[r:%s]->(b)
-                SET r += $props
-                """ % rel_type,
-                {"from_node_id": from_node_id, "to_node_id": to_node_id, "props": rel_props},
+            self.neo4j_conn.write_query(
+                self.templates.merge_relationship(rel_type, key='id'),
+                {"source": from_node_id, "target": to_node_id, "props": rel_props},
             )
         except Exception as e:
             print("Execution had an error: ", e)
@@ -456,13 +1493,9 @@ class GraphGenerator:
             None
         """
         try:
-            self.neo4j_conn.query(
-                """
-                MATCH (a)-[r:%s]->(b)
-                WHERE a.id = $from_node_id AND b.id = $to_node_id
-                DELETE r
-                """ % rel_type,
-                {"from_node_id": from_node_id, "to_node_id": to_node_id},
+            self.neo4j_conn.write_query(
+                self.templates.delete_relationship(rel_type, 'id'),
+                {"source": from_node_id, "target": to_node_id},
             )
         except Exception as e:
             print("Execution had an error: ", e)
@@ -484,14 +1517,9 @@ class GraphGenerator:
             None
         """
         try:
-            self.neo4j_conn.query(
-                f"""
-                MATCH (a:{from_node_label}), (b:{to_node_label})
-                WHERE a.{from_property_name} = b.{to_property_name}
-                MERGE (a)-[r:{rel_type}]->(b)
-                SET r += $props
-                """,
-                props=rel_props,
+            self.neo4j_conn.write_query(
+                self.templates.merge_relationship_by_property(from_node_label, to_node_label, from_property_name, to_property_name, rel_type),
+                {"props": rel_props},
             )
         except Exception as e:
             print("Execution had an error: ", e)
@@ -552,11 +1580,184 @@ class ParseData:
 
         return data[:n] if n is not None else data
 
+    def load_graph_json(json_file_path: str) -> dict:
+        """
+        Loads a graph interchange JSON file, building NodeRecord and RelationshipRecord objects while parsing.
+
+        Only the entries of the top-level 'nodes' and 'relationships' lists become records, each as
+        soon as it is decoded; nested objects such as property maps stay dictionaries. Labels, types
+        and property values are interned, so repeated strings such as taxonomy lineages are stored once.
+
+        Args:
+            json_file_path (str): The path to the JSON file with 'nodes' and 'relationships' lists.
+
+        Returns:
+            dict: The JSON data with the nodes and relationships as records.
+        """
+        with open(json_file_path, 'r', encoding='utf-8-sig') as file:
+            return ParseData._decode_graph_json(file.read(), {})
+
+    def _decode_graph_json(text, pool):
+        # Decodes a graph JSON document element by element, turning only the entries of the top-level
+        # 'nodes' and 'relationships' lists into records; nested objects such as property maps stay dicts
+        decoder = json.JSONDecoder()
+        whitespace = re.compile(r'[ \t\n\r]*')
+
+        def skip(index, expected=None):
+            index = whitespace.match(text, index).end()
+            if expected is not None:
+                if text[index:index + 1] != expected:
+                    raise json.JSONDecodeError(f"Expecting '{expected}'", text, index)
+                index = whitespace.match(text, index + 1).end()
+            return index
+
+        index = skip(0)
+        if text[index:index + 1] != '{':
+            return decoder.decode(text)
+        data = {}
+        index = skip(index, '{')
+        while text[index:index + 1] != '}':
+            key, index = decoder.raw_decode(text, index)
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, index)
+            index = skip(index, ':')
+            if key in ('nodes', 'relationships') and text[index:index + 1] == '[':
+                value = []
+                index = skip(index, '[')
+                while text[index:index + 1] != ']':
+                    item, index = decoder.raw_decode(text, index)
+                    value.append(ParseData._to_record(item, pool))
+                    index = skip(index)
+                    if text[index:index + 1] != ']':
+                        index = skip(index, ',')
+                        if text[index:index + 1] == ']':
+                            raise json.JSONDecodeError("Illegal trailing comma before end of array", text, index)
+                index += 1
+            else:
+                value, index = decoder.raw_decode(text, index)
+            data[key] = value
+            index = skip(index)
+            if text[index:index + 1] != '}':
+                index = skip(index, ',')
+                if text[index:index + 1] == '}':
+                    raise json.JSONDecodeError("Illegal trailing comma before end of object", text, index)
+        if skip(index + 1) != len(text):
+            raise json.JSONDecodeError("Extra data", text, skip(index + 1))
+        return data
+
+    def _to_record(item, pool):
+        # Builds a record from a node or relationship dictionary; other entries are returned as they are
+        if isinstance(item, dict):
+            if 'labels' in item and 'properties' in item:
+                return NodeRecord.from_dict(item, pool)
+            if 'from' in item and 'to' in item and 'type' in item:
+                return RelationshipRecord.from_dict(item, pool)
+        return item
+
+    def iter_graph_file(file_path: str, chunk_size: int = 10000):
+        """
+        Reads a graph interchange file in chunks of NodeRecord and RelationshipRecord objects.
+
+        The format and compression are detected from the extension (see graph_file_format).
+        JSON Lines and msgpack files are streamed, so memory is bounded by chunk_size;
+        a .json file is loaded whole and then chunked. Records come in file order.
+
+        Args:
+            file_path (str): The path to the file, e.g. 'payload.json', 'payload.jsonl.gz' or 'payload.msgpack.zst'.
+            chunk_size (int, optional): The number of records per chunk. Defaults to 10000.
+
+        Yields:
+            list: The records of a chunk.
+        """
+        file_format, compression = graph_file_format(file_path)
+        pool = {}
+
+        with _open_graph_file(file_path, 'rb', compression) as file:
+            if file_format == 'json':
+                data = ParseData._decode_graph_json(file.read().decode('utf-8-sig'), pool)
+                records = data.get('nodes', []) + data.get('relationships', [])
+            elif file_format == 'jsonl':
+                records = (ParseData._to_record(json.loads(line), pool) for line in io.TextIOWrapper(file, encoding='utf-8-sig') if line.strip())
+            else:
+                if msgpack is None:
+                    raise ImportError("Reading .msgpack files requires the msgpack package: pip install msgpack")
+                records = ParseData._iter_msgpack_records(msgpack.Unpacker(file, raw=False, use_list=False), pool)
+
+            chunk = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+    def _iter_msgpack_records(unpacker, pool):
+        # Arrays are ('K', key_id, keys) declaring a property key tuple, ('N', id, labels, key_id, values)
+        # and ('R', from, to, type), with the relationship properties as a fifth element when it has any
+        keys_by_id = {}
+        for item in unpacker:
+            if item[0] == 'N':
+                yield NodeRecord(item[1], intern_value(pool, item[2]), keys_by_id[item[3]], tuple(intern_value(pool, value) for value in item[4]))
+            elif item[0] == 'R':
+                properties = dict(item[4]) if len(item) > 4 else None
+                yield RelationshipRecord(intern_value(pool, item[1]), intern_value(pool, item[2]), sys.intern(item[3]), properties=properties)
+            elif item[0] == 'K':
+                keys_by_id[item[1]] = tuple(sys.intern(key) for key in item[2])
+
+    def write_graph_file(file_path: str, nodes, relationships):
+        """
+        Writes nodes and relationships to a graph interchange file, in the format given by its extension.
+
+        .json keeps the indented layout of payload.json. .jsonl writes one record per line, nodes first.
+        .msgpack writes a stream of arrays in which each distinct tuple of property keys is declared once
+        and nodes only carry their values. Add .gz or .zst to compress.
+
+        Args:
+            file_path (str): The path to the output file.
+            nodes (iterable): NodeRecord objects or node dictionaries.
+            relationships (iterable): RelationshipRecord objects or relationship dictionaries.
+
+        Returns:
+            None
+        """
+        file_format, compression = graph_file_format(file_path)
+        with _open_graph_file(file_path, 'wb', compression) as file:
+            if file_format == 'json':
+                text = io.TextIOWrapper(file, encoding='utf-8')
+                json.dump({'nodes': list(nodes), 'relationships': list(relationships)}, text, indent=4, default=record_to_dict)
+                text.flush()
+                text.detach()
+            elif file_format == 'jsonl':
+                for record in nodes:
+                    file.write(json.dumps(record, default=record_to_dict).encode('utf-8') + b'\n')
+                for record in relationships:
+                    file.write(json.dumps(record, default=record_to_dict).encode('utf-8') + b'\n')
+            else:
+                if msgpack is None:
+                    raise ImportError("Writing .msgpack files requires the msgpack package: pip install msgpack")
+                packer = msgpack.Packer()
+                key_ids = {}
+                for node in nodes:
+                    if not isinstance(node, NodeRecord):
+                        node = NodeRecord.from_dict(node, {})
+                    key_id = key_ids.get(node.keys)
+                    if key_id is None:
+                        key_id = key_ids[node.keys] = len(key_ids)
+                        file.write(packer.pack(('K', key_id, node.keys)))
+                    file.write(packer.pack(('N', node.id, node.labels, key_id, node.values)))
+                for rel in relationships:
+                    if not isinstance(rel, RelationshipRecord):
+                        rel = RelationshipRecord.from_dict(rel, {})
+                    if rel.properties:
+                        file.write(packer.pack(('R', rel.source, rel.target, rel.type, rel.properties)))
+                    else:
+                        file.write(packer.pack(('R', rel.source, rel.target, rel.type)))
+
     # Extracting test.json Schema
     # TODO: ADAPT TO EXTRACT SCHEMA FROM BOTH JSON FROM STAN AND JAY
     def extract_schema_and_data_from_json(json_file_path):
-        with open(json_file_path, 'r') as file:
-            json_data = json.load(file)
+        json_data = ParseData.load_graph_json(json_file_path)
 
         schema = {
             "nodes": [],
@@ -568,29 +1769,14 @@ class ParseData:
         }
 
         # Extracting nodes and their properties
-        for node in json_data.get("nodes", []):  # Iterate through the list of nodes
-            node_label = node['labels'][0]  # Assuming each node has at least one label
+        for node in json_data.get("nodes", []):  # Iterate through the list of node records
+            node_label = node.labels[0]  # Assuming each node has at least one label
             if node_label not in schema["nodes"]:
                 schema["nodes"].append(node_label)
-            node_properties = node['properties']
-            data["nodes"].append({  # Correct usage of append for a list
-                "label": node_label,
-                "properties": node_properties
-            })
-
-        # Extracting relationships and their properties
-        for relationship in json_data.get("relationships", []):  # Iterate through the list of relationships
-            from_node = relationship['from']
-            to_node = relationship['to']
-            relationship_type = relationship['type']
-
-            # Append the relationship dictionary to the data["relationships"] list
-            data["relationships"].append({
-                "from": from_node,
-                "to": to_node,
-                "type": relationship_type
-                # Add more properties here if needed
-            })
+            data["nodes"].append(node)
+
+        # Extracting relationships
+        data["relationships"].extend(json_data.get("relationships", []))
 
         return schema, data
 
@@ -622,3 +1808,486 @@ class ParseData:
                 header = re.sub(r'[^\w]', '_', header)
         return headers
 
+
+
+# CSV Adapter
+def _find_csv_chunks(csv_file_path, n_chunks):
+    """
+    Splits the data section of a CSV file into byte ranges aligned to record boundaries.
+
+    Each range starts right after a newline that is outside a quoted field: the parity of the
+    quote characters before a candidate split tells whether it falls inside a field, in which
+    case the split moves on to the next line.
+
+    Args:
+        csv_file_path (str): The path to the CSV file.
+        n_chunks (int): The desired number of chunks.
+
+    Returns:
+        tuple[list[str], list[tuple[int, int]]]: The CSV header and the (start, end) byte offsets of each chunk.
+    """
+    with open(csv_file_path, 'rb') as file:
+        header = next(csv.reader([file.readline().decode('utf-8-sig')]))
+        data_start = file.tell()
+        file_size = os.fstat(file.fileno()).st_size
+        step = max(1, (file_size - data_start) // max(1, n_chunks))
+
+        offsets = [data_start]
+        scanned, quotes = data_start, 0
+        for k in range(1, n_chunks):
+            # Step back one byte so a split landing exactly on a line start keeps that line
+            target = data_start + k * step - 1
+            if target < scanned:
+                continue
+            file.seek(target)
+            file.readline()
+            position = file.tell()
+            quotes += _count_quotes(file, scanned, position)
+            # An odd number of quotes means the line break ends inside a quoted field
+            while quotes % 2 and position < file_size:
+                line = file.readline()
+                quotes += line.count(b'"')
+                position = file.tell()
+            scanned = position
+            if position >= file_size:
+                break
+            if position > offsets[-1]:
+                offsets.append(position)
+        offsets.append(file_size)
+
+    return header, [(start, end) for start, end in zip(offsets[:-1], offsets[1:]) if end > start]
+
+
+def _count_quotes(file, start, end, block_size=1 << 20):
+    """
+    Counts the quote characters between two byte offsets of a file, leaving it positioned at end.
+    """
+    file.seek(start)
+    count = 0
+    while start < end:
+        block = file.read(min(block_size, end - start))
+        if not block:
+            break
+        count += block.count(b'"')
+        start += len(block)
+    return count
+
+
+def _parse_csv_chunk(task):
+    """
+    Parses one byte range of a CSV file into a string-table batch.
+
+    Only the columns used by the mapping are kept. Each distinct value is stored once in the
+    string table and every row becomes a run of table indexes in an array, so the batch is
+    cheap to send back from a worker process: a short list of strings and a block of bytes.
+    Rows shorter than the header are padded with None, as `csv.DictReader` does.
+
+    Args:
+        task (tuple): (csv_file_path, start, end, used_columns) as built by CSVGraphAdapter.adapt.
+
+    Returns:
+        tuple[list, array]: The string table, whose entry 0 is None, and the row-major table indexes.
+    """
+    csv_file_path, start, end, used_columns = task
+    table = {None: 0}
+    indexes = array('I')
+    width = max(used_columns, default=-1) + 1
+    with open(csv_file_path, 'rb') as file:
+        file.seek(start)
+        for row in csv.reader(_read_lines(file, end - start)):
+            if not row:
+                continue
+            if len(row) < width:
+                row.extend([None] * (width - len(row)))
+            indexes.extend([table.setdefault(row[column], len(table)) for column in used_columns])
+    return list(table), indexes
+
+
+def _read_lines(file, size):
+    """
+    Yields the decoded lines of the next size bytes of a binary file, keeping their terminators.
+
+    Lines are split on b'\\n' only, so csv.reader sees the same text as with newline='' and
+    quoted fields keep their line breaks; a UTF-8 character never spans a b'\\n'.
+    """
+    while size > 0:
+        line = file.readline(size)
+        if not line:
+            break
+        size -= len(line)
+        yield line.decode('utf-8')
+
+
+def _map_csv_rows(rows, node_mapping, relationship_mapping):
+    """
+    Maps parsed CSV rows to NodeRecord and RelationshipRecord objects, interning their strings.
+
+    Rows shorter than the header are padded with None, as `csv.DictReader` does.
+
+    Args:
+        rows (iterable[list[str]]): The CSV rows.
+        node_mapping (list): The node mapping built by CSVGraphAdapter.
+        relationship_mapping (list): The relationship mapping built by CSVGraphAdapter.
+
+    Returns:
+        tuple[list[NodeRecord], list[RelationshipRecord]]: The nodes, without IDs, and the relationships of the rows.
+    """
+    width = 1 + max(
+        [column for _, _, columns in node_mapping for column in columns if column is not None]
+        + [column for _, _, _, from_column, to_column in relationship_mapping for column in (from_column, to_column)],
+        default=-1
+    )
+    pool = {}
+    nodes = []
+    relationships = []
+    for row in rows:
+        if not row:
+            continue
+        row = [intern_value(pool, value) for value in row]
+        if len(row) < width:
+            row.extend([None] * (width - len(row)))
+        for labels, keys, columns in node_mapping:
+            values = tuple(row[column] if column is not None else "" for column in columns)
+            nodes.append(NodeRecord(None, labels, keys, values))
+        for rel_type, from_label, to_label, from_column, to_column in relationship_mapping:
+            relationships.append(RelationshipRecord(row[from_column], row[to_column], rel_type, from_label, to_label))
+    return nodes, relationships
+
+
+class CSVGraphAdapter:
+    """
+    Adapts a CSV file to the graph interchange format (nodes and relationships) using a schema.json mapping.
+
+    The CSV is split into byte ranges aligned to record boundaries which are parsed in a process
+    pool. Workers send back compact string-table batches (see _parse_csv_chunk) which are kept
+    as they are, in file order, and only turned into records when read, so the merge in the
+    parent stays small and node IDs and the output are the same for any number of workers.
+
+    Args:
+        schema_json_path (str): The path to the schema JSON file.
+        n_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+
+    Attributes:
+        schema (dict): The loaded schema.
+        n_workers (int): The number of worker processes.
+
+    Methods:
+        build_mapping(header): Resolves the schema to CSV column indexes, as used by adapt and IngestionPipeline.
+        adapt(csv_file_path): Returns the node and relationship records for a CSV file.
+        adapt_to_json(csv_file_path, output_json_path): Writes the nodes and relationships of a CSV file to a JSON file.
+
+    Example usage:
+        adapter = CSVGraphAdapter("schema.json")
+        adapter.adapt_to_json("data/Microbiomics_BGC_dataset_test.csv", "payload.json")
+    """
+
+    def __init__(self, schema_json_path, n_workers=None):
+        with open(schema_json_path) as json_file:
+            self.schema = json.load(json_file)
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+    def build_mapping(self, header):
+        """
+        Resolves the schema node properties and relationships to CSV column indexes.
+
+        Args:
+            header (list[str]): The CSV header.
+
+        Returns:
+            tuple[list, list]: The node mapping and the relationship mapping.
+        """
+        columns = {column: index for index, column in enumerate(header)}
+
+        # Each node gets its mapped properties followed by 'name', taken from the column named after its label
+        node_mapping = []
+        id_to_label = {}
+        for node in self.schema['nodes']:
+            label = sys.intern(node['labels'][0])
+            id_to_label[node['id']] = label
+            props = [prop for prop in node['properties'] if prop in columns and prop != 'name']
+            keys = tuple(sys.intern(prop) for prop in props) + ('name',)
+            node_mapping.append(((label,), keys, [columns[prop] for prop in props] + [columns.get(label)]))
+
+        # A relationship links the values of the columns named after its source and target labels
+        relationship_mapping = []
+        for rel in self.schema.get('relationships', []):
+            from_label = id_to_label.get(rel['fromId'])
+            to_label = id_to_label.get(rel['toId'])
+            if from_label in columns and to_label in columns:
+                relationship_mapping.append((sys.intern(rel['type']), from_label, to_label, columns[from_label], columns[to_label]))
+
+        return node_mapping, relationship_mapping
+
+    def adapt(self, csv_file_path):
+        """
+        Parses a CSV file into nodes and relationships.
+
+        Args:
+            csv_file_path (str): The path to the CSV file.
+
+        Returns:
+            dict: A dictionary with 'nodes' (NodeSequence) and 'relationships' (RelationshipSequence),
+            read-only sequences that build NodeRecord and RelationshipRecord objects as they are read.
+        """
+        header, chunks = _find_csv_chunks(csv_file_path, self.n_workers)
+        node_mapping, relationship_mapping = self.build_mapping(header)
+
+        # Workers only send back the columns the mapping uses; a missing label column reads as ""
+        used_columns = sorted({column for _, _, columns in node_mapping for column in columns if column is not None}
+                              | {column for rel in relationship_mapping for column in rel[3:]})
+        position = {column: index for index, column in enumerate(used_columns)}
+        position[None] = len(used_columns)
+        width = len(used_columns)
+        node_getters = [(labels, keys, self._row_getter([position[column] for column in columns])) for labels, keys, columns in node_mapping]
+        relationship_getters = [
+            (rel_type, from_label, to_label, position[from_column], position[to_column])
+            for rel_type, from_label, to_label, from_column, to_column in relationship_mapping
+        ]
+
+        tasks = [(csv_file_path, start, end, used_columns) for start, end in chunks]
+        if self.n_workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                results = list(executor.map(_parse_csv_chunk, tasks))
+        else:
+            results = [_parse_csv_chunk(task) for task in tasks]
+
+        # Keep the batches in chunk order; only each chunk's string table is touched here,
+        # pooled so that equal values from different chunks share one object.
+        pool = {}
+        rows = ColumnarRows(width)
+        for strings, indexes in results:
+            rows.append([intern_value(pool, value) for value in strings], indexes)
+
+        return {
+            'nodes': NodeSequence(rows, node_getters),
+            'relationships': RelationshipSequence(rows, relationship_getters)
+        }
+
+    @staticmethod
+    def _row_getter(positions):
+        """
+        Returns a function that picks the values at positions from a row as a tuple.
+        """
+        if len(positions) == 1:
+            position = positions[0]
+            return lambda row: (row[position],)
+        return itemgetter(*positions)
+
+    def adapt_to_json(self, csv_file_path, output_json_path):
+        """
+        Parses a CSV file into nodes and relationships and writes them to a graph interchange file.
+
+        Args:
+            csv_file_path (str): The path to the CSV file.
+            output_json_path (str): The path to the output file; its extension selects the format,
+                e.g. 'payload.json', 'payload.jsonl.gz' or 'payload.msgpack.zst'.
+
+        Returns:
+            None
+        """
+        output_model = self.adapt(csv_file_path)
+        ParseData.write_graph_file(output_json_path, output_model['nodes'], output_model['relationships'])
+        print(f"Adapted model with {len(output_model['nodes'])} nodes saved to {output_json_path}")
+
+
+
+# Pipelined ingestion
+class IngestionPipeline:
+    """
+    Ingests a CSV file with reader, transformer and writer stages running concurrently on threads.
+
+    The reader parses the CSV in batches of rows, the transformer maps them to node and relationship
+    records with the schema.json mapping, and the writer merges them with GraphGenerator.write_records.
+    Stages are connected by bounded queues, so a slow writer holds back the reader instead of letting
+    batches pile up in memory. Parsing and mapping are Python code sharing one core under the GIL;
+    what the pipeline gains is overlapping them with database I/O. For multi-core parsing of a
+    whole file, use CSVGraphAdapter.
+
+    Args:
+        generator (GraphGenerator): The generator used to write the batches.
+        schema_json_path (str): The path to the schema JSON file.
+        batch_rows (int, optional): The number of CSV rows per batch. Defaults to 1000.
+        queue_size (int, optional): The maximum number of batches waiting in each queue. Defaults to 4.
+        taxonomy (bool, optional): Whether the reader also feeds the 'Taxonomy' column into a
+            TaxonomyTrie, written with GraphGenerator.write_taxonomy once all batches are merged.
+            Defaults to False.
+
+    Attributes:
+        metrics (dict): The metrics of the last run, see run().
+        trie (TaxonomyTrie): The taxonomy trie of the last run, None unless taxonomy is True.
+
+    Methods:
+        run(csv_file_path): Ingests a CSV file and returns the stage and queue metrics.
+
+    Example usage:
+        generator = GraphGenerator(conn)
+        pipeline = IngestionPipeline(generator, "schema.json")
+        metrics = pipeline.run("data/Microbiomics_BGC_dataset_test.csv")
+    """
+
+    _DONE = object()
+
+    def __init__(self, generator, schema_json_path, batch_rows=1000, queue_size=4, taxonomy=False):
+        self.generator = generator
+        self.adapter = CSVGraphAdapter(schema_json_path, n_workers=1)
+        self.batch_rows = batch_rows
+        self.queue_size = queue_size
+        self.taxonomy = taxonomy
+        self.metrics = {}
+        self.trie = None
+
+    def run(self, csv_file_path):
+        """
+        Ingests a CSV file through the pipeline.
+
+        Args:
+            csv_file_path (str): The path to the CSV file.
+
+        Returns:
+            dict: 'stages' maps each stage to its 'items', 'busy_seconds' and 'wait_seconds'
+            (time blocked on its queues); 'queues' maps each queue to its 'maxsize',
+            'max_depth' and 'mean_depth' sampled on every put; 'seconds' is the total run time.
+            The stage with the most busy time and the least wait is the bottleneck.
+            With taxonomy=True, 'taxonomy_seconds' is the time spent writing the trie.
+
+        Raises:
+            ValueError: If the CSV header lacks the column named after a schema label, or
+                taxonomy is True and the CSV has no 'Taxonomy' column.
+            Exception: The first error raised by a stage, after all stages have stopped.
+        """
+        self._stop = threading.Event()
+        self._errors = []
+        self._lock = threading.Lock()
+        self._queues = {
+            'rows': queue.Queue(maxsize=self.queue_size),
+            'records': queue.Queue(maxsize=self.queue_size)
+        }
+        self.metrics = {
+            'stages': {},
+            'queues': {name: {'maxsize': self.queue_size, 'max_depth': 0, 'mean_depth': 0.0, 'puts': 0} for name in self._queues}
+        }
+
+        # utf-8-sig drops a byte order mark, which would otherwise hide the first column name
+        with open(csv_file_path, newline='', encoding='utf-8-sig') as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader)
+            node_mapping, relationship_mapping = self.adapter.build_mapping(header)
+            missing = [label for (label,), _, columns in node_mapping if columns[-1] is None]
+            if missing:
+                raise ValueError(f"{csv_file_path} has no column for the schema labels {missing}")
+            taxonomy_column = None
+            self.trie = None
+            if self.taxonomy:
+                if 'Taxonomy' not in header:
+                    raise ValueError(f"taxonomy=True needs a 'Taxonomy' column in {csv_file_path}")
+                taxonomy_column = header.index('Taxonomy')
+                self.trie = TaxonomyTrie()
+            self.generator.generate_name_indexes(label for (label,), _, _ in node_mapping)
+
+            threads = [
+                threading.Thread(target=self._run_stage, args=('reader', self._read, reader, taxonomy_column)),
+                threading.Thread(target=self._run_stage, args=('transformer', self._transform, node_mapping, relationship_mapping)),
+                threading.Thread(target=self._run_stage, args=('writer', self._write))
+            ]
+
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.metrics['seconds'] = time.perf_counter() - start
+
+        for queue_metrics in self.metrics['queues'].values():
+            queue_metrics.pop('puts')
+        if self._errors:
+            raise self._errors[0]
+
+        if self.trie is not None:
+            start = time.perf_counter()
+            self.generator.write_taxonomy(self.trie)
+            self.metrics['taxonomy_seconds'] = time.perf_counter() - start
+        return self.metrics
+
+    def _run_stage(self, stage, target, *args):
+        self.metrics['stages'][stage] = {'items': 0, 'busy_seconds': 0.0, 'wait_seconds': 0.0}
+        start = time.perf_counter()
+        try:
+            target(stage, *args)
+        except Exception as e:
+            with self._lock:
+                self._errors.append(e)
+            self._stop.set()
+        stage_metrics = self.metrics['stages'][stage]
+        stage_metrics['busy_seconds'] = time.perf_counter() - start - stage_metrics['wait_seconds']
+
+    def _put(self, stage, name, item):
+        """
+        Puts an item on a queue, blocking while it is full unless the pipeline is stopping.
+        """
+        target = self._queues[name]
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.metrics['stages'][stage]['wait_seconds'] += time.perf_counter() - start
+
+        depth = target.qsize()
+        with self._lock:
+            queue_metrics = self.metrics['queues'][name]
+            queue_metrics['puts'] += 1
+            queue_metrics['max_depth'] = max(queue_metrics['max_depth'], depth)
+            queue_metrics['mean_depth'] += (depth - queue_metrics['mean_depth']) / queue_metrics['puts']
+
+    def _get(self, stage, name):
+        """
+        Gets an item from a queue, or _DONE if the pipeline is stopping.
+        """
+        source = self._queues[name]
+        start = time.perf_counter()
+        item = self._DONE
+        while not self._stop.is_set():
+            try:
+                item = source.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        self.metrics['stages'][stage]['wait_seconds'] += time.perf_counter() - start
+        return item
+
+    def _read(self, stage, reader, taxonomy_column):
+        batch = []
+        for row in reader:
+            if self._stop.is_set():
+                return
+            if taxonomy_column is not None and taxonomy_column < len(row):
+                self.trie.add(row[taxonomy_column])
+            batch.append(row)
+            if len(batch) == self.batch_rows:
+                self._put(stage, 'rows', batch)
+                self.metrics['stages'][stage]['items'] += len(batch)
+                batch = []
+        if batch:
+            self._put(stage, 'rows', batch)
+            self.metrics['stages'][stage]['items'] += len(batch)
+        self._put(stage, 'rows', self._DONE)
+
+    def _transform(self, stage, node_mapping, relationship_mapping):
+        while True:
+            rows = self._get(stage, 'rows')
+            if rows is self._DONE:
+                self._put(stage, 'records', self._DONE)
+                return
+            self._put(stage, 'records', _map_csv_rows(rows, node_mapping, relationship_mapping))
+            self.metrics['stages'][stage]['items'] += len(rows)
+
+    def _write(self, stage):
+        while True:
+            records = self._get(stage, 'records')
+            if records is self._DONE:
+                return
+            nodes, relationships = records
+            self.generator.write_records(nodes, relationships)
+            self.metrics['stages'][stage]['items'] += len(nodes) + len(relationships)
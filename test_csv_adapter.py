@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Checks that CSVGraphAdapter gives the same output for any number of chunks. Run with: python -m pytest
+
+import csv, io, json
+import pytest
+from kg_nal import CSVGraphAdapter, _find_csv_chunks, record_to_dict
+
+
+SCHEMA = {
+    'nodes': [
+        {'id': 'n0', 'labels': ['BGC'], 'properties': {'name': '', 'bgc_length': ''}},
+        {'id': 'n1', 'labels': ['Genome'], 'properties': {'name': '', 'gcc': ''}},
+        {'id': 'n2', 'labels': ['product'], 'properties': {'name': ''}},
+        {'id': 'n3', 'labels': ['Taxonomy'], 'properties': {'name': ''}}
+    ],
+    'relationships': [
+        {'id': 'n0', 'fromId': 'n1', 'toId': 'n0', 'type': 'CONTAINS', 'properties': {}},
+        {'id': 'n1', 'fromId': 'n0', 'toId': 'n2', 'type': 'PRODUCES', 'properties': {}},
+        {'id': 'n2', 'fromId': 'n3', 'toId': 'n0', 'type': 'CONTAINS', 'properties': {}}
+    ]
+}
+
+HEADER = ['BGC', 'Genome', 'Taxonomy', 'bgc_length', 'gcc', 'product']
+
+
+def make_rows(n_rows=60):
+    rows = []
+    for i in range(n_rows):
+        rows.append([f'bgc_{i}', f'genome_{i % 7}', f'd__Bacteria;p__P{i % 3};s__', str(1000 + i), f'gcc_{i % 5}', f'product_{i % 4}'])
+    # Quoted newlines, including lines that look like a record of their own
+    rows[3][2] = 'd__Bacteria;\np__Quoted\n'
+    rows[11][2] = 'line one\n"bgc_x","genome_x"\nline three'
+    rows[20][0] = 'bgc_"twenty"'
+    rows[21][5] = '""'
+    rows[29][2] = '\n\n\n'
+    # Separators that str.splitlines would treat as line breaks
+    rows[37][0] = 'bgc \x85\x0c\x1c37'
+    # Short rows, which csv.DictReader fills with None
+    rows[45] = rows[45][:2]
+    rows[52] = rows[52][:1]
+    return rows
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    schema_path = tmp_path / 'schema.json'
+    schema_path.write_text(json.dumps(SCHEMA))
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(HEADER)
+    writer.writerows(make_rows())
+    csv_path = tmp_path / 'bgc.csv'
+    csv_path.write_bytes(b'\xef\xbb\xbf' + buffer.getvalue().encode('utf-8'))
+    return str(csv_path), str(schema_path)
+
+
+def adapt(csv_path, schema_path, n_workers):
+    result = CSVGraphAdapter(schema_path, n_workers=n_workers).adapt(csv_path)
+    return json.loads(json.dumps(result, default=record_to_dict))
+
+
+def test_file_is_split_into_several_chunks(csv_file):
+    csv_path, _ = csv_file
+    header, chunks = _find_csv_chunks(csv_path, 8)
+    assert header == HEADER
+    assert len(chunks) > 1
+
+
+def test_single_chunk_matches_dict_reader(csv_file):
+    csv_path, schema_path = csv_file
+    with open(csv_path, newline='', encoding='utf-8-sig') as file:
+        expected = list(csv.DictReader(file))
+    result = adapt(csv_path, schema_path, 1)
+
+    labels = [node['labels'][0] for node in SCHEMA['nodes']]
+    assert len(result['nodes']) == len(expected) * len(labels)
+    for index, row in enumerate(expected):
+        nodes = result['nodes'][index * len(labels):(index + 1) * len(labels)]
+        assert [node['properties']['name'] for node in nodes] == [row[label] for label in labels]
+        assert nodes[0]['properties']['bgc_length'] == row['bgc_length']
+    assert [rel['from'] for rel in result['relationships'][1::3]] == [row['BGC'] for row in expected]
+
+
+@pytest.mark.parametrize('n_workers', [2, 3, 5, 8, 40])
+def test_output_does_not_depend_on_the_number_of_chunks(csv_file, n_workers):
+    csv_path, schema_path = csv_file
+    assert adapt(csv_path, schema_path, n_workers) == adapt(csv_path, schema_path, 1)
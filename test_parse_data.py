@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Checks that ParseData.load_graph_json decodes graph JSON files like json.load. Run with: python -m pytest
+
+import json
+import pytest
+from kg_nal import ParseData, NodeRecord, RelationshipRecord, record_to_dict
+
+
+VALID_DOCUMENTS = {
+    'empty': '{}',
+    'whitespace': ' \n\t{ "nodes" : [ ] ,\r\n "relationships":[] }\n ',
+    'not an object': '[{"labels": ["BGC"], "properties": {"name": "a"}}]',
+    'nested maps': json.dumps({
+        'meta': {'from': 'a', 'to': 'b', 'type': 'x'},
+        'nodes': [{'id': 'n0', 'labels': ['BGC'], 'properties': {'name': 'a', 'route': {'from': 'p', 'to': 'q', 'type': 't'}}}],
+        'relationships': [{'from': 'a', 'to': 'b', 'type': 'CONTAINS', 'properties': {'weight': 2, 'path': [{'from': 1, 'to': 2, 'type': 3}]}}]
+    }, indent=2),
+    'escapes': json.dumps({'nodes': [{'id': 'n0', 'labels': ['B"GC'], 'properties': {'name': 'café   \\ ] } ,'}}]}, ensure_ascii=True),
+    'other lists': '{"nodes": {"labels": [], "properties": {}}, "relationships": [1, "two", null, {"fromId": "n1", "toId": "n0"}]}',
+    'duplicate keys': '{"nodes": [], "nodes": [{"id": "n1", "labels": ["Genome"], "properties": {"name": "g"}}]}',
+}
+
+MALFORMED_DOCUMENTS = {
+    'empty': '',
+    'trailing comma in list': '{"nodes": [{"id": "n0", "labels": [], "properties": {}},]}',
+    'trailing comma in object': '{"nodes": [],}',
+    'extra data': '{"nodes": []} []',
+    'missing colon': '{"nodes" []}',
+    'missing comma': '{"nodes": [] "relationships": []}',
+    'unterminated list': '{"nodes": [',
+    'unterminated object': '{"nodes": []',
+    'non-string key': '{1: []}',
+    'leading comma': '{"nodes": [, {}]}',
+}
+
+
+def write(tmp_path, text):
+    path = tmp_path / 'graph.json'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('name', VALID_DOCUMENTS)
+def test_load_graph_json_matches_json_load(tmp_path, name):
+    path = write(tmp_path, VALID_DOCUMENTS[name])
+    with open(path) as file:
+        expected = json.load(file)
+    loaded = ParseData.load_graph_json(path)
+    assert json.loads(json.dumps(loaded, default=record_to_dict)) == expected
+
+
+def test_load_graph_json_matches_json_load_on_payload():
+    with open('payload.json') as file:
+        expected = json.load(file)
+    loaded = ParseData.load_graph_json('payload.json')
+    assert all(isinstance(node, NodeRecord) for node in loaded['nodes'])
+    assert all(isinstance(rel, RelationshipRecord) for rel in loaded['relationships'])
+    assert json.loads(json.dumps(loaded, default=record_to_dict)) == expected
+
+
+def test_load_graph_json_builds_records_only_from_top_level_lists(tmp_path):
+    loaded = ParseData.load_graph_json(write(tmp_path, VALID_DOCUMENTS['nested maps']))
+    node, = loaded['nodes']
+    rel, = loaded['relationships']
+    assert isinstance(loaded['meta'], dict)
+    assert isinstance(node, NodeRecord) and isinstance(node.properties['route'], dict)
+    assert isinstance(rel, RelationshipRecord) and rel.properties['weight'] == 2
+    assert isinstance(rel.properties['path'][0], dict)
+
+
+def test_load_graph_json_accepts_a_byte_order_mark(tmp_path):
+    path = tmp_path / 'graph.json'
+    path.write_bytes(b'\xef\xbb\xbf' + VALID_DOCUMENTS['nested maps'].encode('utf-8'))
+    loaded = ParseData.load_graph_json(str(path))
+    assert loaded['nodes'][0].properties['name'] == 'a'
+
+
+@pytest.mark.parametrize('name', MALFORMED_DOCUMENTS)
+def test_load_graph_json_rejects_malformed_documents(tmp_path, name):
+    path = write(tmp_path, MALFORMED_DOCUMENTS[name])
+    with pytest.raises(json.JSONDecodeError):
+        with open(path) as file:
+            json.load(file)
+    with pytest.raises(json.JSONDecodeError):
+        ParseData.load_graph_json(path)